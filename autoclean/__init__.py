@@ -1,3 +1,10 @@
+import pandas as pd
+
+# The cleaner takes shallow copies and relies on Copy-on-Write to protect the
+# caller's frame; CoW is always on from pandas 3.0 and opt-in before that.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 from .main import run_pipeline
 from .cleaner import clean_dataset
 from .profiler import profile_dataset
@@ -1,136 +1,250 @@
 # autoclean/cleaner.py
 from __future__ import annotations
 
-from typing import List, Tuple, Optional
+from collections import Counter
+from itertools import product
+from typing import Dict, List, Tuple, Optional
 import numpy as np
 import pandas as pd
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+from .profiler import normalize_missing_tokens
+
 
 BOOL_TRUE = {"true", "t", "yes", "y", "1"}
 BOOL_FALSE = {"false", "f", "no", "n", "0"}
 
+# every upper/lower-case spelling of the tokens above, so most values resolve
+# with a single dict hit and never need strip()/lower()
+_BOOL_MAP: Dict[str, bool] = {
+    "".join(chars): value
+    for tokens, value in ((BOOL_TRUE, True), (BOOL_FALSE, False))
+    for token in tokens
+    for chars in product(*({ch.lower(), ch.upper()} for ch in token))
+}
+
+
+# per-column counts of what the cleaner changed, e.g.
+# {"quantity": {"filled_na": 38, "capped": 4}}
+CleaningDelta = Dict[str, Dict[str, int]]
+
+
+def _record(delta: Optional[CleaningDelta], col: str, key: str, n: int) -> None:
+    if delta is None or not n:
+        return
+    entry = delta.setdefault(col, {})
+    entry[key] = entry.get(key, 0) + int(n)
+
+
+# dtype.kind codes (also set by the nullable and pyarrow extension dtypes);
+# a char compare is far cheaper than the pd.api.types.is_* dispatch
+_NUMERIC_KINDS = "iufc"
+_BOOL_KIND = "b"
+_DATETIME_KIND = "M"
+
+
+def _dtype_buckets(df: pd.DataFrame) -> Tuple[pd.Index, pd.Index, pd.Index]:
+    """Split columns into (numeric, bool, categorical) in one pass over the dtypes."""
+    kinds = [dt.kind for dt in df.dtypes]
+    num = [k in _NUMERIC_KINDS for k in kinds]
+    bools = [k == _BOOL_KIND for k in kinds]
+    other = [not (n or b) for n, b in zip(num, bools)]
+    return df.columns[num], df.columns[bools], df.columns[other]
+
 
 def _to_numeric(series: pd.Series) -> pd.Series:
+    # already numeric: nothing to parse, hand back the same column
+    if series.dtype.kind in _NUMERIC_KINDS:
+        return series
     return pd.to_numeric(series, errors="coerce")
 
 
+def _lookup_bool(value) -> Optional[bool]:
+    if not isinstance(value, str):
+        # bools, ints and missing values go through their string form ("nan", "<NA>" -> None)
+        value = str(value)
+    hit = _BOOL_MAP.get(value)
+    if hit is None:
+        hit = _BOOL_MAP.get(value.strip().lower())
+    return hit
+
+
 def _parse_bool(series: pd.Series) -> pd.Series:
-    s = series.copy()
+    if series.dtype.kind == _BOOL_KIND:
+        return series.astype("boolean")
+
+    # one dict lookup per value; anything unrecognised (incl. "", "nan", "none") becomes NA
+    values = [_lookup_bool(v) for v in series.astype(object).to_numpy()]
+    return pd.Series(pd.array(values, dtype="boolean"), index=series.index)
 
-    # normalize
-    s = s.astype("string")
-    s = s.str.strip().str.lower()
 
-    # treat empty-ish tokens as missing
-    s = s.replace({"": pd.NA, "nan": pd.NA, "none": pd.NA})
+def _infer_datetime_format(series: pd.Series, sample_size: int = 10) -> Optional[str]:
+    """Format shared by at least 80% of a small non-null sample, else None."""
+    sample = series.dropna().head(sample_size)
+    guesses = Counter(
+        guess_datetime_format(v) for v in sample.to_numpy(dtype=object) if isinstance(v, str)
+    )
+    guesses.pop(None, None)
+    if not guesses:
+        return None
+    fmt, hits = guesses.most_common(1)[0]
+    return fmt if hits >= 0.8 * len(sample) else None
 
-    out = pd.Series(pd.NA, index=s.index, dtype="boolean")
-    out[s.isin(BOOL_TRUE)] = True
-    out[s.isin(BOOL_FALSE)] = False
 
-    if series.dtype == bool:
-        out = series.astype("boolean")
+def _to_datetime(series: pd.Series) -> pd.Series:
+    kind = series.dtype.kind
+    if kind == _DATETIME_KIND:
+        return series
 
-    return out
+    # integer columns are read as Unix timestamps (seconds)
+    if kind in "iu":
+        values = series.astype("float64") if series.hasnans else series.astype("int64")
+        return pd.to_datetime(values, unit="s", errors="coerce")
+
+    # a known format takes the vectorized path; otherwise let pandas infer it
+    fmt = _infer_datetime_format(series)
+    if fmt is not None:
+        return pd.to_datetime(series, format=fmt, errors="coerce")
+    return pd.to_datetime(series, errors="coerce")
 
 
 def _try_parse_datetime(df: pd.DataFrame, col: str, actions: List[str]) -> None:
     if col not in df.columns:
         return
     before_na = df[col].isna().sum()
-    df[col] = pd.to_datetime(df[col], errors="coerce")
+    df[col] = _to_datetime(df[col])
     after_na = df[col].isna().sum()
     actions.append(f"try_parse_datetime: {col} (na {before_na}->{after_na})")
 
 
-def _fill_missing_numeric(df: pd.DataFrame, col: str, strategy: str, actions: List[str]) -> None:
-    if col not in df.columns:
+def _fill_missing_numeric(
+    df: pd.DataFrame,
+    cols: pd.Index,
+    strategy: str,
+    actions: List[str],
+    delta: Optional[CleaningDelta] = None,
+) -> None:
+    cols = cols.intersection(df.columns, sort=False)
+    if cols.empty:
         return
 
-    df[col] = _to_numeric(df[col])
-    before = int(df[col].isna().sum())
-    if before == 0:
+    before = df[cols].isna().sum()
+    todo = before.index[before > 0]
+    if todo.empty:
         return
 
+    block = df[todo]
     if strategy == "median":
-        val = df[col].median(skipna=True)
+        vals = block.median(skipna=True)
     elif strategy == "mean":
-        val = df[col].mean(skipna=True)
+        vals = block.mean(skipna=True)
     elif strategy == "mode":
-        m = df[col].mode(dropna=True)
-        val = m.iloc[0] if len(m) else np.nan
+        m = block.mode(dropna=True)
+        vals = m.iloc[0] if len(m) else pd.Series(np.nan, index=todo)
     else:
         raise ValueError(f"Unknown numeric fill strategy: {strategy}")
 
-    if pd.isna(val):
+    todo = vals.index[vals.notna()]
+    if todo.empty:
         return
 
-    df[col] = df[col].fillna(val)
-    after = int(df[col].isna().sum())
-    actions.append(f"fill_missing: {col} ({strategy}) (na {before}->{after})")
-
+    df[todo] = df[todo].fillna(vals[todo])
+    after = df[todo].isna().sum()
+    for col in todo:
+        actions.append(f"fill_missing: {col} ({strategy}) (na {int(before[col])}->{int(after[col])})")
+        _record(delta, col, "filled_na", before[col] - after[col])
 
-def _fill_missing_bool_mode(df: pd.DataFrame, col: str, actions: List[str]) -> None:
-    if col not in df.columns:
-        return
 
-    df[col] = _parse_bool(df[col])
-    before = int(df[col].isna().sum())
-    if before == 0:
+def _fill_missing_bool_mode(
+    df: pd.DataFrame, cols: pd.Index, actions: List[str], delta: Optional[CleaningDelta] = None
+) -> None:
+    cols = cols.intersection(df.columns, sort=False)
+    if cols.empty:
         return
 
-    mode_vals = df[col].mode(dropna=True)
-    fill_val = mode_vals.iloc[0] if len(mode_vals) else False
-    df[col] = df[col].fillna(fill_val).astype("boolean")
-
-    after = int(df[col].isna().sum())
-    actions.append(f"fill_missing: {col} (mode={bool(fill_val)}) (na {before}->{after})")
-
-
-def _fill_missing_categorical_unknown(df: pd.DataFrame, col: str, actions: List[str]) -> None:
-    if col not in df.columns:
+    for col in cols:
+        df[col] = _parse_bool(df[col])
+    before = df[cols].isna().sum()
+    todo = before.index[before > 0]
+    if todo.empty:
         return
 
-    # Only for non-numeric columns
-    if pd.api.types.is_numeric_dtype(df[col]):
+    # mode() pads shorter columns with NA; an all-missing column falls back to False
+    mode_vals = df[todo].mode(dropna=True)
+    for col in todo:
+        fill_val = mode_vals[col].iloc[0] if len(mode_vals) else pd.NA
+        if pd.isna(fill_val):
+            fill_val = False
+        df[col] = df[col].fillna(fill_val).astype("boolean")
+        after = int(df[col].isna().sum())
+        actions.append(f"fill_missing: {col} (mode={bool(fill_val)}) (na {int(before[col])}->{after})")
+        _record(delta, col, "filled_na", before[col] - after)
+
+
+def _fill_missing_categorical_unknown(
+    df: pd.DataFrame, cols: pd.Index, actions: List[str], delta: Optional[CleaningDelta] = None
+) -> None:
+    cols = cols.intersection(df.columns, sort=False)
+    if cols.empty:
         return
 
-    before = int(df[col].isna().sum())
-    if before == 0:
+    before = df[cols].isna().sum()
+    todo = before.index[before > 0]
+    if todo.empty:
         return
 
-    df[col] = df[col].fillna("Unknown")
-    after = int(df[col].isna().sum())
-    actions.append(f"fill_missing: {col} (categorical='Unknown') (na {before}->{after})")
+    df[todo] = df[todo].fillna("Unknown")
+    after = df[todo].isna().sum()
+    for col in todo:
+        actions.append(f"fill_missing: {col} (categorical='Unknown') (na {int(before[col])}->{int(after[col])})")
+        _record(delta, col, "filled_na", before[col] - after[col])
 
 
-def _cap_outliers_iqr(df: pd.DataFrame, col: str, actions: List[str], k: float = 1.5) -> None:
-    if col not in df.columns:
-        return
-    if not pd.api.types.is_numeric_dtype(df[col]):
-        return
-    if pd.api.types.is_bool_dtype(df[col]) or str(df[col].dtype) == "boolean":
-        return
-
-    s = df[col].dropna()
-    if s.empty:
+def _cap_outliers_iqr(
+    df: pd.DataFrame,
+    cols: pd.Index,
+    actions: List[str],
+    k: float = 1.5,
+    delta: Optional[CleaningDelta] = None,
+) -> None:
+    cols = cols.intersection(df.columns, sort=False)
+    if cols.empty:
         return
 
-    q1 = s.quantile(0.25)
-    q3 = s.quantile(0.75)
+    # both quartiles for every column in one reduction; plain float bounds so a
+    # nullable column in the bucket doesn't turn the others into Float64
+    qs = df[cols].quantile([0.25, 0.75]).astype("float64")
+    q1 = qs.loc[0.25]
+    q3 = qs.loc[0.75]
     iqr = q3 - q1
-    if pd.isna(iqr) or iqr == 0:
+
+    # skip empty and constant columns
+    valid = iqr.notna() & (iqr != 0)
+    cols = cols[valid.to_numpy()]
+    if cols.empty:
         return
 
-    lo = q1 - k * iqr
-    hi = q3 + k * iqr
+    num = df[cols]
+    capped = num.clip(lower=(q1 - k * iqr)[cols], upper=(q3 + k * iqr)[cols], axis=1)
+    df[cols] = capped
 
-    before = df[col].copy()
-    df[col] = df[col].clip(lower=lo, upper=hi)
+    changed = (num.notna() & (num != capped)).sum()
+    for col in cols:
+        if changed[col]:
+            actions.append(f"cap_outliers: {col} (changed {int(changed[col])})")
+            _record(delta, col, "capped", changed[col])
 
-    changed = int((before.notna() & (before != df[col])).sum())
-    if changed:
-        actions.append(f"cap_outliers: {col} (changed {changed})")
+
+def _store_numeric(df: pd.DataFrame, col: str, values: np.ndarray) -> None:
+    # keep nullable dtypes (e.g. Int64 from to_numeric on string columns) when the values fit
+    try:
+        df[col] = pd.array(values, dtype=df[col].dtype)
+    except (TypeError, ValueError):
+        df[col] = values
 
 
 def _reconcile_price_qty_total(
@@ -139,6 +253,7 @@ def _reconcile_price_qty_total(
     qty_col: str = "quantity",
     total_col: str = "total_spent",
     actions: Optional[List[str]] = None,
+    delta: Optional[CleaningDelta] = None,
 ) -> int:
     if actions is None:
         actions = []
@@ -150,55 +265,51 @@ def _reconcile_price_qty_total(
     if not all(c in df.columns for c in (price_col, qty_col, total_col)):
         return 0
 
-    p = df[price_col]
-    q = df[qty_col]
-    t = df[total_col]
+    # work on plain float arrays; the three masks below are mutually exclusive
+    p, q, t = (
+        df[c].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        for c in (price_col, qty_col, total_col)
+    )
+    pn, qn, tn = ~np.isnan(p), ~np.isnan(q), ~np.isnan(t)
 
-    filled = 0
+    m_total = pn & qn & ~tn
+    m_price = tn & qn & ~pn & (q != 0)
+    m_qty = tn & pn & ~qn & (p != 0)
 
-    mask = p.notna() & q.notna() & t.isna()
-    if mask.any():
-        df.loc[mask, total_col] = (p[mask] * q[mask]).round(2)
-        filled += int(mask.sum())
+    t[m_total] = np.round(p[m_total] * q[m_total], 2)
+    p[m_price] = np.round(t[m_price] / q[m_price], 2)
+    q[m_qty] = np.round(t[m_qty] / p[m_qty], 2)
 
-    mask = t.notna() & q.notna() & p.isna() & (q != 0)
-    if mask.any():
-        df.loc[mask, price_col] = (t[mask] / q[mask]).round(2)
-        filled += int(mask.sum())
-
-    mask = t.notna() & p.notna() & q.isna() & (p != 0)
-    if mask.any():
-        df.loc[mask, qty_col] = (t[mask] / p[mask]).round(2)
-        filled += int(mask.sum())
+    filled = 0
+    for col, values, mask in ((total_col, t, m_total), (price_col, p, m_price), (qty_col, q, m_qty)):
+        n = int(mask.sum())
+        if n:
+            _store_numeric(df, col, values)
+            _record(delta, col, "filled_na", n)
+            filled += n
 
     if filled > 0:
         actions.append(f"reconcile: filled {filled} values across price/qty/total")
     return filled
 
 
-def clean_dataset(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
-    cleaned = df.copy()
+def clean_dataset(
+    df: pd.DataFrame,
+    normalized: bool = False,
+    delta: Optional[CleaningDelta] = None,
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Clean a copy of df and return it with a log of the actions taken.
+    If delta is given, per-column fill/cap counts are recorded into it.
+    """
+    # shallow: with Copy-on-Write only the columns we reassign get copied
+    cleaned = df.copy(deep=False)
     actions: List[str] = []
 
     # --- Normalize common missing tokens in object columns ---
-    for c in cleaned.columns:
-        if cleaned[c].dtype == object or pd.api.types.is_string_dtype(cleaned[c]):
-            cleaned[c] = (
-                cleaned[c]
-                .astype("string")
-                .str.strip()
-                .replace(
-                    {
-                        "": pd.NA,
-                        "NA": pd.NA,
-                        "N/A": pd.NA,
-                        "null": pd.NA,
-                        "None": pd.NA,
-                        "nan": pd.NA,
-                        "?": pd.NA,      # ✅ if any survived ingestion
-                    }
-                )
-            )
+    # (skipped when the caller already ran normalize_missing_tokens)
+    if not normalized:
+        cleaned = normalize_missing_tokens(cleaned)
 
     actions.append("normalize_strings: stripped whitespace + standardized missing markers")
 
@@ -215,28 +326,21 @@ def clean_dataset(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
             cleaned[num_col] = _to_numeric(cleaned[num_col])
 
     # --- Reconcile retail math relationship first (if present) ---
-    _reconcile_price_qty_total(cleaned, actions=actions)
+    _reconcile_price_qty_total(cleaned, actions=actions, delta=delta)
+
+    # --- Bucket columns by dtype once ---
+    num_cols, bool_cols, cat_cols = _dtype_buckets(cleaned)
 
     # --- Fill numeric missing (median is safest default) ---
-    # Skip boolean dtype columns — they are handled separately below
-    for col in cleaned.columns:
-        if pd.api.types.is_numeric_dtype(cleaned[col]) and not (
-            pd.api.types.is_bool_dtype(cleaned[col]) or str(cleaned[col].dtype) == "boolean"
-        ):
-            _fill_missing_numeric(cleaned, col, strategy="median", actions=actions)
+    _fill_missing_numeric(cleaned, num_cols, strategy="median", actions=actions, delta=delta)
 
     # --- Fill boolean missing (mode) ---
-    for col in cleaned.columns:
-        if pd.api.types.is_bool_dtype(cleaned[col]) or str(cleaned[col].dtype) == "boolean":
-            _fill_missing_bool_mode(cleaned, col, actions)
+    _fill_missing_bool_mode(cleaned, bool_cols, actions, delta)
 
     # --- Fill categorical missing with "Unknown" ---
-    for col in cleaned.columns:
-        _fill_missing_categorical_unknown(cleaned, col, actions)
+    _fill_missing_categorical_unknown(cleaned, cat_cols, actions, delta)
 
     # --- Outlier capping (optional): numeric columns only ---
-    for col in cleaned.columns:
-        if pd.api.types.is_numeric_dtype(cleaned[col]):
-            _cap_outliers_iqr(cleaned, col, actions)
+    _cap_outliers_iqr(cleaned, num_cols, actions, delta=delta)
 
     return cleaned, actions
\ No newline at end of file
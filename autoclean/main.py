@@ -1,9 +1,12 @@
 # autoclean/main.py
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
 from typing import Optional
 
-from .profiler import profile_dataset
+from .profiler import STRING_DTYPE, normalize_missing_tokens, profile_dataset, update_profile
 from .cleaner import clean_dataset
 from .reporter import write_report
 
@@ -14,6 +17,134 @@ def _safe_makedirs_for_file(path: str) -> None:
         os.makedirs(folder, exist_ok=True)
 
 
+# pandas' default NA strings plus UCI Adult-style "?" markers
+_CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null", "?", " ?",
+]
+
+
+_ARROW_STRING_TYPES = {pa.string(): STRING_DTYPE, pa.large_string(): STRING_DTYPE}
+
+# tried in pandas' order when re-typing a column once its padding is gone
+_ARROW_RETRY_TYPES = (pa.int64(), pa.float64(), pa.bool_())
+
+
+def _skip_initial_space(table: pa.Table) -> pa.Table:
+    """
+    Arrow's equivalent of pandas' skipinitialspace=True. Arrow keeps ", "-padded
+    cells (" 2", " NA", " ") as text, which turns a padded numeric column into a
+    string column; drop the leading spaces, null the NA markers and re-type.
+    """
+    null_values = pa.array(_CSV_NULL_VALUES)
+    for i, col in enumerate(table.columns):
+        if not pa.types.is_string(col.type) or not pc.any(pc.starts_with(col, " ")).as_py():
+            continue
+        col = pc.utf8_ltrim(col, characters=" ")
+        col = pc.if_else(pc.is_in(col, value_set=null_values), pa.scalar(None, pa.string()), col)
+        for typ in _ARROW_RETRY_TYPES:
+            try:
+                col = pc.cast(col, typ)
+                break
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                continue
+        table = table.set_column(i, table.field(i).name, col)
+    return table
+
+
+def _read_csv(input_path: str) -> pd.DataFrame:
+    """Multithreaded pyarrow parse; falls back to pandas for files arrow can't type."""
+    convert = {"null_values": _CSV_NULL_VALUES, "strings_can_be_null": True}
+    try:
+        # peek at the types arrow infers from the first block and pin any
+        # date/time columns to text, so date parsing is left to the cleaner
+        reader = pv.open_csv(input_path, convert_options=pv.ConvertOptions(**convert))
+        schema = reader.schema
+        reader.close()
+        text_types = {f.name: pa.string() for f in schema if pa.types.is_temporal(f.type)}
+
+        table = pv.read_csv(
+            input_path,
+            convert_options=pv.ConvertOptions(column_types=text_types, **convert),
+        )
+    except pa.ArrowInvalid:
+        # e.g. a column that looks numeric in the first block but isn't later on
+        table = None
+
+    # arrow keeps repeated header names as-is; pandas dedupes them ("a", "a.1")
+    names = {name.lstrip(" ") for name in table.column_names} if table is not None else ()
+    if table is None or len(names) != table.num_columns:
+        return pd.read_csv(
+            input_path,
+            na_values=["?", " ?"],        # UCI Adult-style missing markers
+            keep_default_na=True,
+            skipinitialspace=True         # trims leading spaces after commas
+        )
+
+    # keep text columns in Arrow memory rather than boxing them into objects
+    table = _skip_initial_space(table)
+    table = table.rename_columns([name.lstrip(" ") for name in table.column_names])
+    return table.to_pandas(types_mapper=_ARROW_STRING_TYPES.get)
+
+
+_ARROW_ERRORS = (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError)
+
+
+def _csv_column(col: pd.Series) -> pa.Array:
+    """One column as an arrow array whose CSV text matches what ``to_csv`` writes."""
+    dtype = col.dtype
+    if dtype.kind in "mM":
+        s = col.dropna()
+        if dtype.kind == "M" and getattr(dtype, "tz", None) is None:
+            # date-only columns: "2024-04-08", as pandas does
+            if (s == s.dt.normalize()).all():
+                return pa.array(col, from_pandas=True).cast(pa.date32())
+            if (s == s.dt.floor("s")).all():
+                secs = pa.array(col, from_pandas=True).cast(pa.timestamp("s"))
+                return pc.strftime(secs, format="%Y-%m-%d %H:%M:%S")
+        # sub-second, tz-aware or timedelta: let pandas pick the text format
+        return pa.array(col.astype(str).mask(col.isna()), type=pa.string(), from_pandas=True)
+
+    try:
+        arr = pa.array(col, from_pandas=True)
+    except _ARROW_ERRORS:
+        # mixed objects, e.g. a datetime column whose gaps were filled with "Unknown"
+        return pa.array(col.map(str, na_action="ignore"), type=pa.string(), from_pandas=True)
+
+    if pa.types.is_floating(arr.type):
+        # arrow writes 10.0 as "10"; keep the ".0" so the column reads back as float
+        text = pc.cast(arr, pa.string())
+        whole = pc.match_substring_regex(text, r"^-?\d+$")
+        return pc.if_else(whole, pc.binary_join_element_wise(text, ".0", ""), text)
+    if pa.types.is_boolean(arr.type):
+        return pc.if_else(arr, "True", "False")
+    return arr
+
+
+def _write_csv(df: pd.DataFrame, output_path: str) -> None:
+    """Multithreaded pyarrow write, formatted like ``DataFrame.to_csv``.
+
+    Arrow quotes every text field, including the header and the float/bool
+    columns rendered as text here; the values and the dtypes they read back
+    as are the same.
+    """
+    if df.shape[1] == 1 and df.iloc[:, 0].isna().any():
+        # arrow writes a lone null as a blank line, which readers skip;
+        # to_csv writes "" there instead
+        df.to_csv(output_path, index=False)
+        return
+
+    try:
+        table = pa.table([_csv_column(df.iloc[:, i]) for i in range(df.shape[1])],
+                         names=[str(c) for c in df.columns])
+        pv.write_csv(table, output_path,
+                     write_options=pv.WriteOptions(include_header=True, quoting_style="needed"))
+    except _ARROW_ERRORS:
+        # extension types arrow can't convert or write
+        df.to_csv(output_path, index=False)
+
+
 def run_pipeline(input_path: str, output_path: str, report_path: Optional[str] = None):
     # -----------------------------
     # Load dataset (robust parsing)
@@ -23,12 +154,7 @@ def run_pipeline(input_path: str, output_path: str, report_path: Optional[str] =
         if ext in (".xlsx", ".xls"):
             df = pd.read_excel(input_path, na_values=["?", " ?"])
         else:
-            df = pd.read_csv(
-                input_path,
-                na_values=["?", " ?"],        # UCI Adult-style missing markers
-                keep_default_na=True,
-                skipinitialspace=True         # trims leading spaces after commas
-            )
+            df = _read_csv(input_path)
     except Exception as e:
         raise RuntimeError(f"Failed to read {ext or 'file'}: {input_path} ({type(e).__name__}: {e})")
 
@@ -40,6 +166,10 @@ def run_pipeline(input_path: str, output_path: str, report_path: Optional[str] =
         .str.replace(" ", "_")
     )
 
+    # Strip strings + standardize missing markers ONCE; profiler and
+    # cleaner both work on this frame
+    df = normalize_missing_tokens(df)
+
     print("\n=== DATASET LOADED ===")
     print(f"Shape: {df.shape[0]} rows × {df.shape[1]} columns")
     print(df.head())
@@ -48,7 +178,7 @@ def run_pipeline(input_path: str, output_path: str, report_path: Optional[str] =
     # Profile BEFORE cleaning (safe)
     # -----------------------------
     try:
-        profile_before = profile_dataset(df)
+        profile_before = profile_dataset(df, normalized=True)
     except Exception as e:
         profile_before = {
             "rows": len(df),
@@ -77,7 +207,8 @@ def run_pipeline(input_path: str, output_path: str, report_path: Optional[str] =
     # -----------------------------
     # Clean dataset
     # -----------------------------
-    cleaned_df, changes = clean_dataset(df)
+    delta: dict = {}
+    cleaned_df, changes = clean_dataset(df, normalized=True, delta=delta)
 
     print("\n=== CLEANING SUMMARY ===")
     for msg in changes:
@@ -86,8 +217,16 @@ def run_pipeline(input_path: str, output_path: str, report_path: Optional[str] =
     # -----------------------------
     # Profile AFTER cleaning (safe)
     # -----------------------------
+    # Only columns the cleaner filled, capped or retyped need re-profiling;
+    # the rest are identical to the frame profiled above.
     try:
-        profile_after = profile_dataset(cleaned_df)
+        if "error" in profile_before:
+            profile_after = profile_dataset(cleaned_df, normalized=True)
+        else:
+            retyped = {
+                col for col, b, a in zip(df.columns, df.dtypes, cleaned_df.dtypes) if b != a
+            }
+            profile_after = update_profile(profile_before, cleaned_df, set(delta) | retyped)
     except Exception as e:
         profile_after = {
             "rows": len(cleaned_df),
@@ -118,7 +257,7 @@ def run_pipeline(input_path: str, output_path: str, report_path: Optional[str] =
     # -----------------------------
     try:
         _safe_makedirs_for_file(output_path)
-        cleaned_df.to_csv(output_path, index=False)
+        _write_csv(cleaned_df, output_path)
         print("\nCleaned dataset saved to", output_path)
     except Exception as e:
         raise RuntimeError(f"Failed to save cleaned CSV: {output_path} ({type(e).__name__}: {e})")
@@ -1,42 +1,59 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Set
+
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # optional: numpy fallback below
+    njit = None
+
 from pandas.api.types import (
     is_numeric_dtype,
     is_bool_dtype,
     is_datetime64_any_dtype,
 )
 
-# Keep these lowercase because we normalize strings to lowercase
-MISSING_MARKERS = {
+# Keep these lowercase; values are compared case-insensitively
+MISSING_MARKERS = frozenset({
     "", "?", "na", "n/a", "null", "none", "nan"
-}
+})
+
+# Arrow-backed strings: .str methods and isin run as Arrow compute kernels
+# instead of boxing every value into a Python str (the default storage on
+# pandas 3, but not on 2.x)
+STRING_DTYPE = pd.StringDtype("pyarrow")
 
+# currency/thousands separators, footnote daggers and "[1]"-style citations
+_NUMERIC_JUNK_RE = re.compile(r"[\$,†‡]|\[.*?\]")
 
-def _normalize_missing_tokens(df: pd.DataFrame) -> pd.DataFrame:
+
+def normalize_missing_tokens(df: pd.DataFrame) -> pd.DataFrame:
     """
     Make missing detection consistent even when CSV wasn't loaded with na_values.
     - strip whitespace in string/object cols
-    - lowercase
-    - turn common missing markers into real NaN
+    - turn common missing markers (any case) into real NaN
+    Original casing is preserved.
     """
-    df = df.copy()
+    df = df.copy(deep=False)
     obj_cols = df.select_dtypes(include=["object", "string"]).columns
 
     for c in obj_cols:
-        s = (
-            df[c]
-            .astype("string")
-            .str.strip()
-            .str.lower()
-        )
+        s = df[c].astype(STRING_DTYPE).str.strip()
+        # one hash probe per value instead of a replace() pass per marker
+        df[c] = s.mask(s.str.lower().isin(MISSING_MARKERS))
 
-        # after strip+lower, convert markers to NA
-        s = s.replace({m: pd.NA for m in MISSING_MARKERS})
+    return df
 
-        df[c] = s
 
-    return df
+def _fold_case(series: pd.Series) -> pd.Series:
+    """Lowercased copy of a text column, so "Yes"/"yes" count as one value in the stats."""
+    if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+        return series.astype(STRING_DTYPE).str.lower()
+    return series
 
 
 def clean_numeric_series(series: pd.Series) -> pd.Series:
@@ -48,119 +65,210 @@ def clean_numeric_series(series: pd.Series) -> pd.Series:
     if is_datetime64_any_dtype(series) or is_bool_dtype(series):
         return pd.Series([np.nan] * len(series), index=series.index)
 
-    cleaned = (
-        series.astype("string")
-        .str.replace(r"[\$,]", "", regex=True)
-        .str.replace(r"\[.*?\]", "", regex=True)
-        .str.replace(r"[†‡]", "", regex=True)
-        .str.strip()
-        .str.lower()
-    )
+    # single pass with one compiled regex; non-strings are left for to_numeric,
+    # and missing markers ("", "na", "?", ...) coerce to NaN there as well
+    cleaned = [
+        _NUMERIC_JUNK_RE.sub("", v).strip().lower() if isinstance(v, str) else v
+        for v in series.to_numpy(dtype=object)
+    ]
 
-    cleaned = cleaned.replace({m: pd.NA for m in MISSING_MARKERS})
+    return pd.to_numeric(pd.Series(cleaned, index=series.index, dtype=object), errors="coerce")
 
-    return pd.to_numeric(cleaned, errors="coerce")
 
+# rows checked before running the regex clean-up over a whole text column
+_NUMERIC_SAMPLE_ROWS = 1000
 
-def infer_column_type(series: pd.Series) -> str:
-    """Infer semantic column type."""
+
+def _looks_numeric(series: pd.Series) -> bool:
+    """Cheap prescreen on the first values; only clearly non-numeric columns are rejected."""
+    if len(series) <= _NUMERIC_SAMPLE_ROWS:
+        return True
+    # sample present values only, so a run of leading gaps can't reject the column
+    sample = clean_numeric_series(series.dropna().head(_NUMERIC_SAMPLE_ROWS))
+    return sample.notna().mean() > 0.5
+
+
+def _infer_column_type(series: pd.Series) -> tuple:
+    """(semantic type, parsed numeric values or None) so callers don't parse twice."""
     if is_datetime64_any_dtype(series):
-        return "datetime"
+        return "datetime", None
 
     if is_bool_dtype(series):
-        return "binary"
+        return "binary", None
 
     if is_numeric_dtype(series):
-        return "numeric"
+        return "numeric", series
 
-    numeric_version = clean_numeric_series(series)
-    if numeric_version.notna().mean() > 0.8:
-        return "numeric"
+    if _looks_numeric(series):
+        numeric_version = clean_numeric_series(series)
+        if numeric_version.notna().mean() > 0.8:
+            return "numeric", numeric_version
 
     n = len(series)
     if n == 0:
-        return "categorical"
+        return "categorical", None
 
     nunique = series.nunique(dropna=True)
 
     if nunique == 2:
-        return "binary"
+        return "binary", None
 
     unique_ratio = nunique / n
     if unique_ratio > 0.9:
-        return "id"
+        return "id", None
+
+    return "categorical", None
 
-    return "categorical"
+
+def infer_column_type(series: pd.Series) -> str:
+    """Infer semantic column type."""
+    return _infer_column_type(series)[0]
 
 
 def calculate_entropy(series: pd.Series) -> float:
-    probs = series.dropna().value_counts(normalize=True)
-    if probs.empty:
+    # factorize is hash based, so it also copes with mixed-type object columns
+    codes, _ = pd.factorize(series, use_na_sentinel=True)
+    codes = codes[codes >= 0]
+    if codes.size == 0:
         return 0.0
-    return float(-(probs * np.log2(probs + 1e-9)).sum())
+    counts = np.bincount(codes)
+    probs = counts / codes.size
+    return float(-(probs * np.log2(probs)).sum())
+
+
+def _quartiles(arr: np.ndarray) -> tuple:
+    """Linear-interpolated Q1/Q3 (same as Series.quantile) via np.partition, no full sort."""
+    pos = np.array([0.25, 0.75]) * (arr.size - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, arr.size - 1)
+    part = np.partition(arr, np.unique(np.concatenate([lo, hi])))
+    q = part[lo] + (pos - lo) * (part[hi] - part[lo])
+    return float(q[0]), float(q[1])
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _count_outside(arr, lower, upper):
+        # single scan, no temporary boolean arrays; nogil lets the profiler threads overlap
+        count = 0
+        for i in range(arr.size):
+            v = arr[i]
+            count += (v < lower) | (v > upper)
+        return count
+else:
+    def _count_outside(arr, lower, upper):
+        return ((arr < lower) | (arr > upper)).sum()
 
 
 def detect_outliers(series: pd.Series) -> int:
     if not is_numeric_dtype(series):
         return 0
 
-    s = series.dropna()
-    if len(s) < 3:
+    arr = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    arr = arr[~np.isnan(arr)]
+    if arr.size < 3:
+        return 0
+
+    # constant column: IQR is 0, nothing to flag
+    if arr.min() == arr.max():
         return 0
 
-    q1 = s.quantile(0.25)
-    q3 = s.quantile(0.75)
+    q1, q3 = _quartiles(arr)
     iqr = q3 - q1
 
-    if pd.isna(iqr) or iqr == 0:
+    if iqr == 0:
         return 0
 
     lower = q1 - 1.5 * iqr
     upper = q3 + 1.5 * iqr
-    return int(((s < lower) | (s > upper)).sum())
+    return int(_count_outside(arr, lower, upper))
 
 
-def profile_dataset(df: pd.DataFrame) -> dict:
-    # normalize missing tokens so missing% is accurate
-    df = _normalize_missing_tokens(df)
+def _count_duplicate_rows(df: pd.DataFrame) -> int:
+    """Count repeated rows from a vectorized 64-bit row hash instead of df.duplicated()."""
+    if df.empty:
+        return 0
+    # rows differing only in letter case count as duplicates
+    df = df.copy(deep=False)
+    for i in range(df.shape[1]):
+        df.isetitem(i, _fold_case(df.iloc[:, i]))
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return int(hashes.size - np.unique(hashes).size)
+
+
+def _profile_column(raw_col: pd.Series, missing_percent: float) -> dict:
+    # stats are case-insensitive; the frame itself keeps its original casing
+    col = _fold_case(raw_col)
+    col_type, numeric_col = _infer_column_type(col)
+
+    col_profile = {
+        "type": col_type,
+        "missing_percent": missing_percent,
+        "cardinality": int(col.nunique(dropna=True)),
+    }
+
+    if col_type == "numeric":
+        numeric_col = numeric_col.dropna()
+
+        if len(numeric_col) >= 3:
+            col_profile["skew"] = round(float(numeric_col.skew()), 2)
+            outliers = detect_outliers(numeric_col)
+        else:
+            col_profile["skew"] = None
+            outliers = 0
 
-    profile: dict = {}
-    column_profiles: dict = {}
+        col_profile["outliers"] = outliers
 
-    rows, cols = df.shape
-    total_cells = rows * cols
+    if col_type == "categorical":
+        col_profile["entropy"] = round(calculate_entropy(col), 2)
 
-    missing_cells = int(df.isna().sum().sum())
-    duplicate_rows = int(df.duplicated().sum())
-    total_outliers = 0
+    return col_profile
 
-    for col in df.columns:
-        raw_col = df[col]
-        col_type = infer_column_type(raw_col)
 
-        col_profile = {
-            "type": col_type,
-            "missing_percent": round(raw_col.isna().mean() * 100, 2) if rows else 0.0,
-            "cardinality": int(raw_col.nunique(dropna=True)),
-        }
+def profile_dataset(df: pd.DataFrame, normalized: bool = False) -> dict:
+    # normalize missing tokens so missing% is accurate
+    # (skipped when the caller already ran normalize_missing_tokens)
+    if not normalized:
+        df = normalize_missing_tokens(df)
+
+    return _build_profile(df)
 
-        if col_type == "numeric":
-            numeric_col = clean_numeric_series(raw_col).dropna()
 
-            if len(numeric_col) >= 3:
-                col_profile["skew"] = round(float(numeric_col.skew()), 2)
-                outliers = detect_outliers(numeric_col)
-            else:
-                col_profile["skew"] = None
-                outliers = 0
+def update_profile(previous: dict, df: pd.DataFrame, changed: Iterable[str]) -> dict:
+    """
+    Profile df, reusing previous["columns_profile"] for every column not in
+    changed (i.e. whose values are identical to when previous was computed).
+    Dataset-level missing/duplicate counts are always recomputed.
+    """
+    return _build_profile(df, previous.get("columns_profile", {}), set(changed))
+
 
-            col_profile["outliers"] = outliers
-            total_outliers += outliers
+def _build_profile(df: pd.DataFrame, reuse: Optional[dict] = None, changed: Set[str] = frozenset()) -> dict:
+    profile: dict = {}
+    column_profiles: dict = {}
+    reuse = reuse or {}
 
-        if col_type == "categorical":
-            col_profile["entropy"] = round(calculate_entropy(raw_col), 2)
+    rows, cols = df.shape
+    total_cells = rows * cols
+
+    # one isna pass, reused for the per-column missing %
+    missing_counts = df.isna().sum()
+    missing_cells = int(missing_counts.sum())
+    duplicate_rows = _count_duplicate_rows(df)
+
+    # columns are independent and the heavy lifting (partition, unique,
+    # hashing) happens in numpy/pandas C code, so profile them in threads
+    todo = [col for col in df.columns if col in changed or col not in reuse]
+    missing_pcts = [
+        round(missing_counts[col] / rows * 100, 2) if rows else 0.0
+        for col in todo
+    ]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        fresh = dict(zip(todo, pool.map(_profile_column, [df[col] for col in todo], missing_pcts)))
+    for col in df.columns:
+        column_profiles[col] = fresh[col] if col in fresh else dict(reuse[col])
 
-        column_profiles[col] = col_profile
+    total_outliers = sum(p.get("outliers", 0) for p in column_profiles.values())
 
     # ---- Data Health Score ----
     if rows == 0 or total_cells == 0:
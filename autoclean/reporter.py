@@ -4,7 +4,7 @@ from __future__ import annotations
 import json
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, TextIO
 
 from .metrics import compute_health_score
 
@@ -27,31 +27,34 @@ def _ensure_health_score(profile: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
-def _build_markdown(report: Dict[str, Any]) -> str:
+def _write_markdown(report: Dict[str, Any], f: TextIO) -> None:
+    """Stream the Markdown summary straight to an open file, one line at a time."""
     b = report["before"]
     a = report["after"]
     actions = report.get("actions", [])
 
-    lines = []
-    lines.append("# AutoClean++ Report")
-    lines.append("")
-    lines.append(f"**Generated:** {report['generated_at']}")
-    lines.append(f"**Input:** `{report['input_path']}`")
-    lines.append(f"**Output:** `{report['output_path']}`")
-    lines.append("")
-    lines.append("## Summary")
-    lines.append("")
-    lines.append("| Metric | Before | After | Δ |")
-    lines.append("|---|---:|---:|---:|")
+    def line(text: str = "") -> None:
+        f.write(text + "\n")
+
+    line("# AutoClean++ Report")
+    line()
+    line(f"**Generated:** {report['generated_at']}")
+    line(f"**Input:** `{report['input_path']}`")
+    line(f"**Output:** `{report['output_path']}`")
+    line()
+    line("## Summary")
+    line()
+    line("| Metric | Before | After | Δ |")
+    line("|---|---:|---:|---:|")
 
     def row(name: str, key: str, fmt: str = "{:.2f}"):
         bv = b.get(key)
         av = a.get(key)
         if isinstance(bv, (int, float)) and isinstance(av, (int, float)):
             delta = av - bv
-            lines.append(f"| {name} | {fmt.format(bv)} | {fmt.format(av)} | {fmt.format(delta)} |")
+            line(f"| {name} | {fmt.format(bv)} | {fmt.format(av)} | {fmt.format(delta)} |")
         else:
-            lines.append(f"| {name} | {bv} | {av} |  |")
+            line(f"| {name} | {bv} | {av} |  |")
 
     row("Rows", "rows", fmt="{:.0f}")
     row("Columns", "columns", fmt="{:.0f}")
@@ -60,16 +63,14 @@ def _build_markdown(report: Dict[str, Any]) -> str:
     row("Outlier %", "outlier_percent")
     row("Health Score", "data_health_score")
 
-    lines.append("")
-    lines.append("## Cleaning Actions")
-    lines.append("")
+    line()
+    line("## Cleaning Actions")
+    line()
     if actions:
         for act in actions:
-            lines.append(f"- {act}")
+            line(f"- {act}")
     else:
-        lines.append("- (No actions recorded)")
-
-    return "\n".join(lines) + "\n"
+        line("- (No actions recorded)")
 
 
 def _build_html(report: Dict[str, Any]) -> str:
@@ -228,7 +229,7 @@ def write_report(
     md_path = base + ".md"
     _safe_makedirs_for_file(md_path)
     with open(md_path, "w", encoding="utf-8") as f:
-        f.write(_build_markdown(report))
+        _write_markdown(report, f)
 
     # Write HTML
     html_path = base + ".html"